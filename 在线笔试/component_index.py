@@ -0,0 +1,311 @@
+import os
+import csv
+import json
+import sqlite3
+import time
+
+
+class ComponentIndex:
+    def __init__(self, db_path="元器件索引.sqlite"):
+        """
+        跨文档元器件检索索引
+
+        把 test.py / test2.py / extraction_router.py 导出的CSV和JSON写入SQLite，
+        在名称、编码、关键词、原始文本上建立FTS5倒排索引，按文件修改时间增量更新
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        # trigram 分词支持中文和编码子串检索（SQLite 3.34+），旧版本退回 unicode61
+        try:
+            self._create_schema('trigram')
+        except sqlite3.OperationalError:
+            self._create_schema('unicode61')
+
+    def _create_schema(self, tokenizer):
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                document TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS components (
+                id INTEGER PRIMARY KEY,
+                doc_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+                name TEXT,
+                code TEXT,
+                category TEXT,
+                keyword TEXT,
+                page INTEGER,
+                line INTEGER,
+                source TEXT,
+                text TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_components_code ON components(code COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_components_doc ON components(doc_id);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS components_fts USING fts5(
+                name, code, keyword, text,
+                content='components', content_rowid='id', tokenize='{tokenizer}'
+            );
+            CREATE TRIGGER IF NOT EXISTS components_ai AFTER INSERT ON components BEGIN
+                INSERT INTO components_fts(rowid, name, code, keyword, text)
+                VALUES (new.id, new.name, new.code, new.keyword, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS components_ad AFTER DELETE ON components BEGIN
+                INSERT INTO components_fts(components_fts, rowid, name, code, keyword, text)
+                VALUES ('delete', old.id, old.name, old.code, old.keyword, old.text);
+            END;
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    # ---------- 读取导出文件 ----------
+
+    @staticmethod
+    def _document_name(path):
+        """
+        由导出文件名推出所属图纸名（extraction_router 输出为 <图纸>_components.csv / <图纸>_analysis.json）
+        """
+        name = os.path.splitext(os.path.basename(path))[0]
+        for suffix in ('_components', '_analysis'):
+            if name.endswith(suffix):
+                return name[:-len(suffix)]
+        return name
+
+    @staticmethod
+    def _to_int(value):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+
+    def _read_csv(self, path):
+        """
+        读取CSV：支持 test.py 的 components_detailed.csv 和 test2.py 的 image_components.csv
+        """
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                yield {
+                    'name': row.get('元器件名称', ''),
+                    'code': row.get('编码', ''),
+                    'category': row.get('类型') or row.get('类别', ''),
+                    'keyword': row.get('描述', ''),
+                    'page': self._to_int(row.get('所在页') or row.get('页码')),
+                    'line': self._to_int(row.get('所在行')),
+                    'source': row.get('来源') or ('ocr' if '图像索引' in row else 'text'),
+                    'text': row.get('原始文本') or row.get('规格', '')
+                }
+
+    def _read_json(self, path):
+        """
+        读取JSON：支持 test.py 的 components_by_category 和 test2.py 的 components 列表
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if isinstance(data.get('components_by_category'), dict):
+            items = [(category, comp) for category, comp_list in data['components_by_category'].items()
+                     if isinstance(comp_list, list) for comp in comp_list]
+            default_source = 'text'
+        else:
+            items = [(None, comp) for comp in data.get('components', [])]
+            default_source = 'ocr'
+
+        for category, comp in items:
+            if not isinstance(comp, dict):
+                continue
+            yield {
+                'name': comp.get('name', ''),
+                'code': comp.get('code', ''),
+                'category': comp.get('category') or category or '',
+                'keyword': comp.get('keyword') or comp.get('description', ''),
+                'page': self._to_int(comp.get('page')),
+                'line': self._to_int(comp.get('line', comp.get('row'))),
+                'source': comp.get('source', default_source),
+                'text': comp.get('text') or comp.get('context', '')
+            }
+
+    def _read_components(self, path):
+        if path.lower().endswith('.csv'):
+            return list(self._read_csv(path))
+        return list(self._read_json(path))
+
+    # ---------- 增量更新 ----------
+
+    def ingest_file(self, path):
+        """
+        索引单个导出文件，文件未变化时跳过；返回写入的元器件数（跳过返回None）
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self.conn.execute("SELECT id, mtime, size FROM documents WHERE path = ?", (path,)).fetchone()
+        if row and row['mtime'] == stat.st_mtime and row['size'] == stat.st_size:
+            return None
+
+        try:
+            components = self._read_components(path)
+        except (ValueError, UnicodeDecodeError, AttributeError, csv.Error) as e:
+            print(f"⚠️ 跳过无法解析的文件 {os.path.basename(path)}: {str(e)[:50]}")
+            return None
+
+        with self.conn:
+            if row:
+                self.conn.execute("DELETE FROM components WHERE doc_id = ?", (row['id'],))
+                self.conn.execute("DELETE FROM documents WHERE id = ?", (row['id'],))
+            cursor = self.conn.execute(
+                "INSERT INTO documents (path, document, mtime, size, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (path, self._document_name(path), stat.st_mtime, stat.st_size, time.time())
+            )
+            doc_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO components (doc_id, name, code, category, keyword, page, line, source, text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(doc_id, c['name'], c['code'], c['category'], c['keyword'],
+                  c['page'], c['line'], c['source'], c['text']) for c in components]
+            )
+
+        return len(components)
+
+    def remove_file(self, path):
+        path = os.path.abspath(path)
+        with self.conn:
+            row = self.conn.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM components WHERE doc_id = ?", (row['id'],))
+                self.conn.execute("DELETE FROM documents WHERE id = ?", (row['id'],))
+
+    def ingest_directory(self, root, extensions=('.csv', '.json')):
+        """
+        递归索引目录下的导出文件，并移除已删除（或改为只索引JSON）的文件的索引
+        """
+        stats = {'indexed': 0, 'skipped': 0, 'removed': 0, 'components': 0}
+        seen = set()
+
+        for dirpath, _, filenames in os.walk(root):
+            # 同一图纸同时有 _analysis.json 和 _components.csv 时只索引JSON，避免检索结果重复
+            analysed = {filename[:-len('_analysis.json')] for filename in filenames
+                        if filename.endswith('_analysis.json')}
+            for filename in filenames:
+                if not filename.lower().endswith(extensions):
+                    continue
+                if filename.endswith('_components.csv') and filename[:-len('_components.csv')] in analysed:
+                    continue
+                path = os.path.abspath(os.path.join(dirpath, filename))
+                seen.add(path)
+                count = self.ingest_file(path)
+                if count is None:
+                    stats['skipped'] += 1
+                else:
+                    stats['indexed'] += 1
+                    stats['components'] += count
+
+        root = os.path.abspath(root)
+        for row in self.conn.execute("SELECT path FROM documents").fetchall():
+            path = row['path']
+            if path.startswith(root + os.sep) and path not in seen:
+                self.remove_file(path)
+                stats['removed'] += 1
+
+        return stats
+
+    # ---------- 查询 ----------
+
+    def search(self, query, limit=50):
+        """
+        检索元器件：编码精确匹配优先，其次全文匹配
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        columns = ("c.name, c.code, c.category, c.keyword, c.page, c.line, c.source, "
+                   "d.document, d.path")
+        rows = self.conn.execute(
+            f"SELECT {columns} FROM components c JOIN documents d ON d.id = c.doc_id "
+            "WHERE c.code = ? COLLATE NOCASE LIMIT ?",
+            (query, limit)
+        ).fetchall()
+
+        remaining = limit - len(rows)
+        if remaining > 0:
+            # trigram 至少需要3个字符；短查询只做编码精确匹配
+            if len(query) >= 3:
+                phrase = '"' + query.replace('"', '""') + '"'
+                rows += self.conn.execute(
+                    f"SELECT {columns} FROM components_fts f "
+                    "JOIN components c ON c.id = f.rowid JOIN documents d ON d.id = c.doc_id "
+                    "WHERE components_fts MATCH ? AND c.code != ? COLLATE NOCASE "
+                    "ORDER BY rank LIMIT ?",
+                    (phrase, query, remaining)
+                ).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def documents_for(self, *codes):
+        """
+        哪些图纸用到了这些编码，返回 {编码: [图纸名, ...]}
+        """
+        result = {}
+        for code in codes:
+            rows = self.conn.execute(
+                "SELECT DISTINCT d.document FROM components c JOIN documents d ON d.id = c.doc_id "
+                "WHERE c.code = ? COLLATE NOCASE ORDER BY d.document",
+                (code,)
+            ).fetchall()
+            result[code] = [row['document'] for row in rows]
+        return result
+
+    def statistics(self):
+        row = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM documents) AS documents, "
+            "(SELECT COUNT(*) FROM components) AS components"
+        ).fetchone()
+        return dict(row)
+
+
+def main():
+    """
+    主程序 - 建立/更新索引并交互检索
+    """
+    print("=" * 80)
+    print("🔎 线束元器件跨图纸检索")
+    print("=" * 80)
+
+    index = ComponentIndex()
+    try:
+        start = time.perf_counter()
+        stats = index.ingest_directory('.')
+        elapsed = time.perf_counter() - start
+        print(f"索引更新: 新增/更新 {stats['indexed']} 个文件 ({stats['components']} 个元器件), "
+              f"未变化 {stats['skipped']} 个, 移除 {stats['removed']} 个, 用时 {elapsed:.2f}秒")
+
+        total = index.statistics()
+        print(f"索引共 {total['documents']} 个文件, {total['components']} 个元器件")
+
+        while True:
+            query = input("\n请输入编码或名称（回车退出）: ").strip()
+            if not query:
+                break
+
+            start = time.perf_counter()
+            results = index.search(query)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            print(f"找到 {len(results)} 条结果 ({elapsed:.1f}ms)")
+            for r in results:
+                print(f"  [{r['document']}] 第{r['page']}页 {r['name']} ({r['code'] or '-'}) "
+                      f"{r['category']} 来源:{r['source']}")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
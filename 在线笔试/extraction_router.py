@@ -0,0 +1,271 @@
+import fitz  # PyMuPDF
+import os
+import sys
+import importlib.util
+from importlib.machinery import SourceFileLoader
+import numpy as np
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _load_module(name, filename):
+    """
+    按文件路径加载同目录下的脚本
+    test.py 会和标准库的 test 包重名，harness_analysis_detailed.json 的扩展名不是 .py，都不能直接 import
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    loader = SourceFileLoader(name, path)
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+AutomotiveHarnessParser = _load_module('harness_text_parser', 'test.py').AutomotiveHarnessParser
+OptimizedComponentExtractor = _load_module('harness_ocr_extractor', 'test2.py').OptimizedComponentExtractor
+_page_analysis = _load_module('harness_page_analysis', 'harness_analysis_detailed.json')
+profile_page = _page_analysis.profile_page
+
+# 需要OCR的提取方式，与页面画像共用同一张路由表
+OCR_ROUTES = tuple(route for route in _page_analysis.PAGE_ROUTES.values() if 'ocr' in route)
+
+
+class OCRUnavailableError(RuntimeError):
+    """Tesseract未找到或不可用，需要OCR的页无法提取"""
+
+
+class ExtractionRouter:
+    def __init__(self, tesseract_path=None, render_dpi=300):
+        """
+        统一提取路由：文档只打开一次，逐页分类后选择最便宜的提取方式
+
+        页面分类与 harness_analysis_detailed.profile_page 共用：
+        - 有文本层的页：直接读取文本和表格（native）
+        - 有文本层且有大图的页：读取文本和表格，再对页内图像做OCR（native+ocr）
+        - 扫描页：对页内图像做OCR（ocr）
+        - 纯矢量页：渲染为灰度图后OCR（render+ocr）
+        所有页的文本都交给 AutomotiveHarnessParser 的同一套识别规则，输出统一的元器件结构
+        """
+        self.parser = AutomotiveHarnessParser()
+        self.tesseract_path = tesseract_path
+        self.render_dpi = render_dpi
+
+        # OCR提取器只在遇到需要OCR的页时才创建（会检查Tesseract）
+        self._ocr = None
+
+    @property
+    def ocr(self):
+        """
+        第一次使用时创建OCR提取器；Tesseract不可用时抛出 OCRUnavailableError（之后直接抛出，不再重复检查）
+        """
+        if self._ocr is None:
+            self._ocr = OptimizedComponentExtractor(tesseract_path=self.tesseract_path)
+        if not self._ocr.tesseract_available:
+            raise OCRUnavailableError("Tesseract不可用，无法OCR")
+        return self._ocr
+
+    def classify_page(self, doc, page_num):
+        """
+        页面分类，返回 (提取方式, 页面画像)，page_num 从0开始
+        """
+        profile = profile_page(doc, page_num)
+        return profile['route'], profile
+
+    def _native_tables(self, page):
+        """
+        用PyMuPDF提取表格（旧版本没有 find_tables 时跳过）
+        """
+        try:
+            return [table.extract() for table in page.find_tables().tables]
+        except AttributeError:
+            return []
+
+    def _ocr_page(self, doc, page, route):
+        """
+        OCR提取一页的文本：纯矢量页渲染整页，其余只识别页内图像
+        """
+        ocr = self.ocr
+
+        if route == 'render+ocr':
+            # 渲染为灰度图，复制样本后 Pixmap 即可释放
+            pix = page.get_pixmap(dpi=self.render_dpi, colorspace=fitz.csGRAY)
+            grays = [np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width).copy()]
+        else:
+            grays = []
+            for img_info in page.get_images():
+                try:
+                    grays.append(ocr.load_gray_image(doc, img_info[0]))
+                except Exception as e:
+                    print(f"    图像解码失败 - {str(e)[:50]}")
+
+        return "\n".join(ocr.ocr_gray_images(grays))
+
+    def extract(self, pdf_path):
+        """
+        提取PDF内容，结构与 AutomotiveHarnessParser.extract_all_content 相同
+        """
+        print(f"正在解析PDF文件: {os.path.basename(pdf_path)}")
+
+        all_content = {
+            'text': '',
+            'tables': [],
+            'pages': [],
+            'metadata': {}
+        }
+        route_stats = defaultdict(int)
+        ocr_unavailable_pages = []
+
+        doc = fitz.open(pdf_path)
+        try:
+            all_content['metadata']['total_pages'] = len(doc)
+            all_content['metadata']['file_name'] = os.path.basename(pdf_path)
+
+            for page_num, page in enumerate(doc, 1):
+                route, _ = self.classify_page(doc, page_num - 1)
+                route_stats[route] += 1
+                print(f"  处理第 {page_num}/{len(doc)} 页 [{route}]")
+
+                text = page.get_text()
+                tables = []
+                ocr_text = ''
+                if route in ('native', 'native+ocr'):
+                    tables = self._native_tables(page)
+                if route in OCR_ROUTES:
+                    try:
+                        ocr_text = self._ocr_page(doc, page, route)
+                    except OCRUnavailableError as e:
+                        # 不静默输出空页：记录下来，在汇总里报告
+                        print(f"    ❌ {e}")
+                        ocr_unavailable_pages.append(page_num)
+                    # 混合页保留文本层，追加图像区域的OCR文本；其余OCR页以OCR结果为准
+                    text = f"{text}\n{ocr_text}" if route == 'native+ocr' else ocr_text
+
+                all_content['pages'].append({
+                    'page_number': page_num,
+                    'text': text,
+                    'tables': tables,
+                    'route': route,
+                    'ocr_text': ocr_text,
+                    'char_count': len(text),
+                    'bbox': tuple(page.rect)
+                })
+                all_content['text'] += f"\n=== Page {page_num} ===\n{text}"
+
+                for table_num, table in enumerate(tables, 1):
+                    all_content['tables'].append({
+                        'page': page_num,
+                        'table_number': table_num,
+                        'rows': len(table),
+                        'columns': len(table[0]) if table else 0,
+                        'data': table
+                    })
+                    table_text = self.parser._table_to_text(table)
+                    all_content['text'] += f"\n[Table {page_num}-{table_num}]\n{table_text}"
+        finally:
+            doc.close()
+
+        all_content['metadata']['routes'] = dict(route_stats)
+        all_content['metadata']['ocr_unavailable_pages'] = ocr_unavailable_pages
+        print(f"提取完成: {len(all_content['pages'])}页, {len(all_content['tables'])}个表格, "
+              f"路由 {dict(route_stats)}")
+        if ocr_unavailable_pages:
+            print(f"⚠️ Tesseract不可用，{len(ocr_unavailable_pages)} 页未能OCR: {ocr_unavailable_pages}")
+        return all_content
+
+    def process(self, pdf_path, output_dir="router_output"):
+        """
+        提取并识别元器件，导出JSON和CSV
+        """
+        content = self.extract(pdf_path)
+        components = self.parser.find_all_components(content)
+
+        # 标记OCR识别出的元器件来源（混合页只标记出现在图像OCR文本中的）
+        pages = {page['page_number']: page for page in content['pages']}
+        for comp_list in components.values():
+            for comp in comp_list:
+                page = pages.get(comp.get('page'))
+                if page is None or page['route'] not in OCR_ROUTES or 'source' in comp:
+                    continue
+                full_text = comp.get('full_text')
+                if page['route'] != 'native+ocr' or (full_text and full_text in page['ocr_text']):
+                    comp['source'] = 'ocr'
+
+        systems = self.parser.analyze_systems(components)
+
+        os.makedirs(output_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(pdf_path))[0]
+        self.parser.export_detailed_data(components, systems, os.path.join(output_dir, f"{name}_analysis.json"))
+        self.parser.export_component_list(components, os.path.join(output_dir, f"{name}_components.csv"))
+
+        summary = {
+            'file_name': os.path.basename(pdf_path),
+            'routes': content['metadata']['routes'],
+            'total_components': sum(len(comp_list) for comp_list in components.values()),
+        }
+        if content['metadata']['ocr_unavailable_pages']:
+            summary['ocr_unavailable'] = content['metadata']['ocr_unavailable_pages']
+        return summary
+
+
+def _process_one(pdf_path, tesseract_path, output_dir):
+    """
+    进程池中执行：每个进程处理一个PDF
+    """
+    router = ExtractionRouter(tesseract_path=tesseract_path)
+    try:
+        return router.process(pdf_path, output_dir)
+    except Exception as e:
+        print(f"❌ 处理失败 {pdf_path}: {e}")
+        return {'file_name': os.path.basename(pdf_path), 'error': str(e)}
+
+
+def route_corpus(pdf_paths, max_workers=None, tesseract_path=None, output_dir="router_output"):
+    """
+    用同一个进程池处理整批PDF
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_process_one, pdf_paths,
+                                 [tesseract_path] * len(pdf_paths),
+                                 [output_dir] * len(pdf_paths)))
+
+
+def main():
+    """
+    主程序 - 统一提取路由
+    """
+    print("=" * 80)
+    print("🔀 线束图纸统一提取（文本层 + OCR）")
+    print("=" * 80)
+
+    pdf_paths = [file for file in os.listdir('.') if file.lower().endswith('.pdf')]
+    if not pdf_paths:
+        print("❌ 未找到PDF文件")
+        print("当前目录:", os.listdir('.'))
+        return
+
+    print(f"✓ 找到 {len(pdf_paths)} 个PDF文件")
+
+    summaries = route_corpus(
+        pdf_paths,
+        tesseract_path=r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+    )
+
+    print("\n" + "=" * 80)
+    print("处理结果:")
+    print("=" * 80)
+    for summary in summaries:
+        if 'error' in summary:
+            print(f"  ❌ {summary['file_name']}: {summary['error']}")
+        else:
+            print(f"  ✓ {summary['file_name']}: {summary['total_components']} 个元器件, "
+                  f"路由 {summary['routes']}")
+            if 'ocr_unavailable' in summary:
+                print(f"    ⚠️ Tesseract不可用，{len(summary['ocr_unavailable'])} 页未能OCR: "
+                      f"{summary['ocr_unavailable']}")
+
+
+if __name__ == "__main__":
+    main()
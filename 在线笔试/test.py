@@ -1,12 +1,117 @@
 import pdfplumber
 import re
 import json
-from collections import defaultdict
+from collections import Counter, defaultdict
 from datetime import datetime
 import os
 import pandas as pd
 
 
+class PartNumberMatcher:
+    """零件号模糊匹配：字符n-gram倒排索引 + 有界编辑距离"""
+
+    # OCR常见混淆字符，规范化后视为同一字符
+    OCR_CONFUSIONS = str.maketrans({'O': '0', 'I': '1'})
+
+    def __init__(self, q=3):
+        self.q = q
+        self.entries = []  # (原始编码, 规范化编码, 部件信息)
+        self.exact = {}  # 规范化编码 -> 条目序号
+        self.index = defaultdict(list)  # n-gram -> 条目序号列表
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def normalize(cls, code):
+        """规范化编码：大写并合并O/0、I/1"""
+        return code.strip().upper().translate(cls.OCR_CONFUSIONS)
+
+    def _grams(self, code):
+        """编码的n-gram集合（不补位，避免首尾n-gram的倒排表过长）"""
+        return {code[i:i + self.q] for i in range(len(code) - self.q + 1)}
+
+    def add(self, code, info=None):
+        """加入目录，重复编码覆盖旧信息"""
+        key = self.normalize(code)
+        if key in self.exact:
+            entry_id = self.exact[key]
+            self.entries[entry_id] = (code, key, info)
+            return
+
+        entry_id = len(self.entries)
+        self.entries.append((code, key, info))
+        self.exact[key] = entry_id
+        for gram in self._grams(key):
+            self.index[gram].append(entry_id)
+
+    def default_max_distance(self, length):
+        """编码越长允许的编辑距离越大"""
+        if length < 6:
+            return 0
+        if length < 10:
+            return 1
+        if length < 20:
+            return 2
+        return 3
+
+    @staticmethod
+    def _bounded_distance(a, b, max_distance):
+        """编辑距离，超过上限时提前返回 max_distance + 1"""
+        if abs(len(a) - len(b)) > max_distance:
+            return max_distance + 1
+
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i] + [0] * len(b)
+            row_min = i
+            for j, char_b in enumerate(b, 1):
+                current[j] = min(previous[j] + 1,
+                                 current[j - 1] + 1,
+                                 previous[j - 1] + (char_a != char_b))
+                row_min = min(row_min, current[j])
+            if row_min > max_distance:
+                return max_distance + 1
+            previous = current
+
+        return previous[-1]
+
+    def match(self, code, max_distance=None, limit=5):
+        """返回编辑距离上限内的候选 [(距离, 原始编码, 部件信息), ...]，按距离排序"""
+        key = self.normalize(code)
+        if key in self.exact:
+            original, _, info = self.entries[self.exact[key]]
+            return [(0, original, info)]
+
+        if max_distance is None:
+            max_distance = self.default_max_distance(len(key))
+        if max_distance == 0:
+            return []
+
+        # q-gram引理：每次编辑最多破坏q个n-gram，候选至少共享 threshold 个
+        grams = self._grams(key)
+        threshold = len(grams) - self.q * max_distance
+        if threshold <= 0:
+            return []
+
+        # 计数过滤：在倒排表上统计共享n-gram数，只对达到阈值的候选计算编辑距离
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.index.get(gram, ()))
+
+        results = []
+        for entry_id, count in shared.items():
+            if count < threshold:
+                continue
+            original, candidate_key, info = self.entries[entry_id]
+            distance = self._bounded_distance(key, candidate_key, max_distance)
+            if distance <= max_distance:
+                results.append((distance, original, info))
+
+        results.sort(key=lambda item: (item[0], item[1]))
+        return results[:limit]
+
+
 class AutomotiveHarnessParser:
     def __init__(self):
         # 汽车线束专用术语词典
@@ -84,6 +189,34 @@ class AutomotiveHarnessParser:
             }
         }
 
+        # 已知部件的模糊匹配索引（容忍OCR噪声）
+        self.part_matcher = PartNumberMatcher()
+        for code, info in self.known_components.items():
+            self.part_matcher.add(code, info)
+
+    def load_part_catalogue(self, filename):
+        """从CSV加载零件目录（列：编码, 名称, 类型, 描述）"""
+        try:
+            catalogue = pd.read_csv(filename, dtype=str, encoding='utf-8-sig').fillna('')
+        except Exception as e:
+            print(f"❌ 加载零件目录失败: {e}")
+            return 0
+
+        missing = {'编码', '名称', '类型', '描述'} - set(catalogue.columns)
+        if missing:
+            print(f"❌ 加载零件目录失败: 缺少列 {', '.join(sorted(missing))}")
+            return 0
+
+        for code, name, comp_type, description in zip(catalogue['编码'], catalogue['名称'],
+                                                      catalogue['类型'], catalogue['描述']):
+            if code:
+                info = {'name': name, 'type': comp_type, 'description': description}
+                self.known_components[code] = info
+                self.part_matcher.add(code, info)
+
+        print(f"✅ 已加载零件目录: {filename} ({len(self.part_matcher)}个编码)")
+        return len(catalogue)
+
     def extract_all_content(self, pdf_path):
         """从PDF中提取所有内容"""
         print(f"正在解析PDF文件: {os.path.basename(pdf_path)}")
@@ -347,9 +480,10 @@ class AutomotiveHarnessParser:
 
     def _create_component_from_part(self, part_num, context, page_num, line_num):
         """从零件号创建元器件信息"""
-        # 检查是否为已知部件
-        if part_num in self.known_components:
-            known_info = self.known_components[part_num]
+        # 检查是否为已知部件：只有精确匹配（距离0）才算已知部件
+        matches = self.part_matcher.match(part_num, limit=2)
+        if matches and matches[0][0] == 0:
+            _, known_code, known_info = matches[0]
             return {
                 'name': known_info['name'],
                 'type': known_info['type'],
@@ -357,6 +491,8 @@ class AutomotiveHarnessParser:
                 'page': page_num,
                 'line': line_num,
                 'is_known': True,
+                'matched_code': known_code,
+                'match_distance': 0,
                 'description': known_info.get('description', ''),
                 'full_text': context[:100]
             }
@@ -372,31 +508,40 @@ class AutomotiveHarnessParser:
             'full_text': context[:100]
         }
 
-        # 分析零件号特征
-        if 'CA' in part_num:
+        # 模糊命中只作为提示（可能是OCR误识别，也可能是相近的另一个零件），保留识别出的编码
+        # 最近的候选不唯一时不采用
+        if matches and (len(matches) == 1 or matches[1][0] > matches[0][0]):
+            distance, known_code, _ = matches[0]
+            component_info['is_fuzzy_match'] = True
+            component_info['matched_code'] = known_code
+            component_info['match_distance'] = distance
+
+        # 分析零件号特征（规范化后比较，容忍O/0、I/1混淆）
+        part_key = PartNumberMatcher.normalize(part_num)
+        if 'CA' in part_key:
             component_info['type'] = 'harnesses'
 
-            if 'CA1251' in part_num:
+            if 'CA1251' in part_key:
                 component_info['name'] = '一汽解放J6L整车主线束'
                 component_info['description'] = '新款J6L车型整车电气线束总成'
-            elif 'CA1234' in part_num:
+            elif 'CA1234' in part_key:
                 component_info['name'] = '发动机控制线束'
                 component_info['description'] = '发动机相关传感器和执行器线束'
-            elif 'CA1181' in part_num:
+            elif 'CA1181' in part_key:
                 component_info['name'] = '驾驶室电气线束'
                 component_info['description'] = '驾驶室内开关、仪表、控制面板线束'
 
-        elif 'S100001' in part_num:
+        elif 'S100001' in part_key:
             component_info['name'] = 'FA10气驱罐尿素系统线束'
             component_info['type'] = 'harnesses'
             component_info['description'] = '锡柴自主FA10发动机气驱尿素罐专用线束'
 
-        elif 'Z00231' in part_num:
+        elif 'Z00231' in part_key:
             component_info['name'] = '整车线束图纸文件'
             component_info['type'] = 'other'
             component_info['description'] = '线束设计图纸文档'
 
-        elif 'Q00070' in part_num:
+        elif 'Q00070' in part_key:
             component_info['name'] = '国六排放系统线束'
             component_info['type'] = 'harnesses'
             component_info['description'] = '国六排放后处理系统专用线束'
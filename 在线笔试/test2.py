@@ -5,6 +5,7 @@ import io
 import re
 import json
 import os
+import tempfile
 import cv2
 import numpy as np
 from collections import defaultdict
@@ -15,6 +16,9 @@ class OptimizedComponentExtractor:
         """
         优化版元器件提取器
         """
+        # Tesseract检查通过后才置为True，未通过时其余属性都不会初始化
+        self.tesseract_available = False
+
         # 设置Tesseract路径
         if tesseract_path and os.path.exists(tesseract_path):
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
@@ -36,6 +40,7 @@ class OptimizedComponentExtractor:
         except:
             print("❌ Tesseract不可用")
             return
+        self.tesseract_available = True
 
         # 元器件知识库（扩展版）
         self.component_knowledge = {
@@ -107,10 +112,61 @@ class OptimizedComponentExtractor:
             r'(X[0-9]+)',  # X1
         ]
 
+        # OpenCV可直接解码的图像格式（其余格式走Pixmap/PIL兜底）
+        self.cv2_formats = {'png', 'jpeg', 'jpg', 'bmp', 'tif', 'tiff', 'webp', 'pnm', 'pbm', 'pgm', 'ppm'}
+
+        # OCR配置（按顺序重试）
+        self.ocr_configs = [
+            {'lang': 'chi_sim', 'config': '--oem 3 --psm 6'},
+            {'lang': 'chi_sim+eng', 'config': '--oem 3 --psm 6'},
+            {'lang': 'eng', 'config': '--oem 3 --psm 6'},
+            {'lang': 'chi_sim', 'config': '--oem 3 --psm 3'},
+            {'lang': 'chi_sim', 'config': '--oem 1 --psm 6'},
+        ]
+
+        # 归一化：按估计的文字高度缩放到OCR最合适的尺寸，并校正小角度倾斜
+        self.normalize_images = True
+        self.target_text_height = 30  # tesseract 最适合的文字高度(像素)
+        self.max_skew_angle = 10  # 只校正该角度以内的倾斜，避免把图纸中的斜线当成文字倾斜
+
+        # 小图像（图标、标签、表格单元格）批量识别，分摊tesseract进程启动和模型加载开销
+        self.small_image_max_side = 300  # 宽高都不超过该值的图像视为小图像
+        self.ocr_batch_size = 64  # 每次tesseract调用最多识别的图像数
+
         # 存储结果
+        self._reset_results()
+
+    def _reset_results(self):
+        """
+        清空结果及报告用的累计统计
+        """
         self.components = []
         self.stats = defaultdict(int)
 
+        # 报告用的累计统计，随元器件加入实时更新，生成报告时无需重新遍历
+        self.report_page_limit = 15  # 报告中每页最多列出的元器件数
+        self.category_stats = defaultdict(int)
+        self.type_stats = defaultdict(int)
+        self.confidence_stats = defaultdict(int)
+        self.page_counts = defaultdict(int)
+        self.page_preview = defaultdict(list)
+
+    def _add_components(self, components):
+        """
+        加入元器件并更新累计统计
+        """
+        self.components.extend(components)
+
+        for comp in components:
+            self.category_stats[comp['category']] += 1
+            self.type_stats[comp['type']] += 1
+            self.confidence_stats[comp['confidence']] += 1
+
+            page = comp['page']
+            self.page_counts[page] += 1
+            if len(self.page_preview[page]) < self.report_page_limit:
+                self.page_preview[page].append(comp)
+
     def _find_tesseract(self):
         """查找Tesseract"""
         paths = [
@@ -125,18 +181,120 @@ class OptimizedComponentExtractor:
                 return path
         return None
 
+    def load_gray_image(self, doc, xref):
+        """
+        从PDF中直接解码为灰度numpy数组，避免 BytesIO -> PIL -> numpy 的多次拷贝
+        """
+        base_image = doc.extract_image(xref)
+        ext = base_image.get('ext', '').lower()
+
+        # 1. 常见格式：cv2.imdecode 直接在提取出的字节上解码（np.frombuffer 不拷贝）
+        if ext in self.cv2_formats:
+            buffer = np.frombuffer(memoryview(base_image["image"]), dtype=np.uint8)
+            gray = cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE)
+            if gray is not None:
+                return gray
+
+        # 2. 其他格式：由PyMuPDF解码为Pixmap，转为numpy数组
+        try:
+            pix = fitz.Pixmap(doc, xref)
+            if pix.alpha:
+                pix = fitz.Pixmap(pix, 0)  # 去掉alpha通道
+            if pix.n != 1:
+                pix = fitz.Pixmap(fitz.csGRAY, pix)  # 直接转换为灰度
+            # samples_mv 指向 pix 的内存，函数返回后 pix 被释放，必须拷贝一份
+            return np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width).copy()
+        except Exception:
+            pass
+
+        # 3. 特殊格式兜底：PIL解码
+        original = Image.open(io.BytesIO(base_image["image"]))
+        return np.array(original.convert('L'))
+
+    def _estimate_text_layout(self, gray):
+        """
+        估计文字高度(像素)和倾斜角度(度)，无法估计时返回 (None, 0.0)
+        """
+        # 大图先缩小再估计，结果再换算回原尺寸
+        probe_scale = min(1.0, 1500 / max(gray.shape[:2]))
+        probe = gray
+        if probe_scale < 1.0:
+            probe = cv2.resize(gray, None, fx=probe_scale, fy=probe_scale,
+                               interpolation=cv2.INTER_AREA)
+
+        # 文字为前景（白色）
+        _, binary = cv2.threshold(probe, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+        # 连通域高度的中位数近似为文字高度，过滤掉噪点和大块图形
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        probe_h = probe.shape[0]
+        is_text = (heights >= 3) & (heights < probe_h * 0.5) & (areas >= 6) & \
+                  (widths < heights * 5)
+        if count <= 1 or not is_text.any():
+            return None, 0.0
+
+        text_height = float(np.median(heights[is_text])) / probe_scale
+
+        # 前景像素的最小外接矩形角度作为倾斜角度
+        angle = 0.0
+        coords = cv2.findNonZero(binary)
+        if coords is not None and len(coords) > 50:
+            angle = cv2.minAreaRect(coords)[-1]
+            # 不同版本OpenCV的角度范围不同，统一到 [-45, 45]
+            while angle > 45:
+                angle -= 90
+            while angle < -45:
+                angle += 90
+
+        return text_height, angle
+
+    def _normalize_image(self, gray):
+        """
+        缩放和倾斜归一化：文字高度缩放到 target_text_height，校正小角度倾斜。
+        分辨率过高的扫描件会被缩小，节省后续处理和OCR的计算量
+        """
+        text_height, angle = self._estimate_text_layout(gray)
+        if text_height is None:
+            return gray
+
+        # 1. 缩放（限制在合理范围内，偏差不大时不缩放）
+        scale = min(4.0, max(0.25, self.target_text_height / text_height))
+        if abs(scale - 1.0) > 0.15:
+            interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+
+        # 2. 倾斜校正
+        if 0.5 < abs(angle) <= self.max_skew_angle:
+            h, w = gray.shape[:2]
+            matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+            gray = cv2.warpAffine(gray, matrix, (w, h), flags=cv2.INTER_LINEAR,
+                                  borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+
+        return gray
+
     def _preprocess_image(self, image):
         """
         图像预处理 - 提高OCR准确率
         """
-        # 转换为灰度
-        if image.mode != 'L':
-            gray = image.convert('L')
+        if isinstance(image, np.ndarray):
+            # 已经是灰度数组（见 load_gray_image），无需再转换
+            img_array = image
         else:
-            gray = image
+            # 转换为灰度
+            if image.mode != 'L':
+                gray = image.convert('L')
+            else:
+                gray = image
 
-        # 转换为numpy数组
-        img_array = np.array(gray)
+            # 转换为numpy数组
+            img_array = np.array(gray)
+
+        # 0. 缩放和倾斜归一化，使后续固定大小的阈值窗口对任意DPI都适用
+        if self.normalize_images:
+            img_array = self._normalize_image(img_array)
 
         # 1. 自适应阈值（提高对比度）
         binary = cv2.adaptiveThreshold(img_array, 255,
@@ -186,15 +344,7 @@ class OptimizedComponentExtractor:
         results = []
 
         # 尝试不同的OCR配置
-        configs = [
-            {'lang': 'chi_sim', 'config': '--oem 3 --psm 6'},
-            {'lang': 'chi_sim+eng', 'config': '--oem 3 --psm 6'},
-            {'lang': 'eng', 'config': '--oem 3 --psm 6'},
-            {'lang': 'chi_sim', 'config': '--oem 3 --psm 3'},
-            {'lang': 'chi_sim', 'config': '--oem 1 --psm 6'},
-        ]
-
-        for config in configs:
+        for config in self.ocr_configs:
             try:
                 text = pytesseract.image_to_string(
                     image,
@@ -224,9 +374,228 @@ class OptimizedComponentExtractor:
 
         return ""
 
-    def extract_from_pdf(self, pdf_path, max_pages=None, save_images=False):
+    def _ocr_batch(self, images, lang, config):
+        """
+        一次tesseract调用识别多张图像：写成多页TIFF，按分页符拆分结果
+        """
+        if len(images) == 1:
+            return [pytesseract.image_to_string(images[0], lang=lang, config=config)]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tiff_path = os.path.join(tmp_dir, 'batch.tif')
+            images[0].save(tiff_path, save_all=True, append_images=images[1:])
+
+            # tesseract在每页文本后输出分页符'\f'
+            text = pytesseract.image_to_string(tiff_path, lang=lang, config=config)
+
+        texts = text.split('\f')
+        if len(texts) < len(images):
+            # 分页结果对不上时逐张识别，保证结果与图像一一对应
+            return [pytesseract.image_to_string(image, lang=lang, config=config)
+                    for image in images]
+
+        return texts[:len(images)]
+
+    def _ocr_with_retry_batch(self, images):
+        """
+        批量版的 _ocr_with_retry：每种配置只调用一次tesseract，
+        只有结果还不够长的图像进入下一种配置
+        """
+        best = [''] * len(images)
+        remaining = list(range(len(images)))
+
+        for config in self.ocr_configs:
+            if not remaining:
+                break
+
+            try:
+                texts = self._ocr_batch([images[i] for i in remaining],
+                                        config['lang'], config['config'])
+            except Exception:
+                continue
+
+            still_remaining = []
+            for i, text in zip(remaining, texts):
+                if text and len(text.strip()) > len(best[i].strip()):
+                    best[i] = text
+
+                # 与 _ocr_with_retry 一致：结果足够长就不再重试
+                if len(best[i].strip()) <= 20:
+                    still_remaining.append(i)
+            remaining = still_remaining
+
+        return best
+
+    def _is_small_image(self, image):
+        """
+        判断是否为适合批量识别的小图像
+        """
+        return max(image.width, image.height) <= self.small_image_max_side
+
+    def ocr_gray_images(self, grays):
+        """
+        对一组灰度图像做预处理和OCR，返回清理后的非空文本（供 extraction_router 按页调用）
+        小图像批量识别，大图像单独识别；单张图像失败时跳过
+        """
+        images = []
+        for gray in grays:
+            try:
+                images.append(self._enhance_ocr_accuracy(self._preprocess_image(gray)))
+            except Exception as e:
+                print(f"    图像预处理失败 - {str(e)[:50]}")
+
+        small = [image for image in images if self._is_small_image(image)]
+        large = [image for image in images if not self._is_small_image(image)]
+
+        texts = [self._ocr_with_retry(image) for image in large]
+        for start in range(0, len(small), self.ocr_batch_size):
+            try:
+                texts.extend(self._ocr_with_retry_batch(small[start:start + self.ocr_batch_size]))
+            except Exception as e:
+                print(f"    批量识别失败 - {str(e)[:50]}")
+
+        return [self._clean_ocr_text(text) for text in texts if text and text.strip()]
+
+    def _handle_ocr_text(self, text, page_num, img_idx, save_images, output_dir):
+        """
+        处理一张图像的OCR结果：清理文本、提取元器件、保存文本
+        """
+        if text and text.strip():
+            # 清理文本
+            cleaned = self._clean_ocr_text(text)
+
+            print(f"    图像 {img_idx + 1}: ✓ 识别成功 ({len(cleaned)} 字符)")
+
+            # 提取元器件
+            found = self._analyze_text(cleaned, page_num + 1, img_idx + 1)
+
+            if found:
+                self._add_components(found)
+                print(f"      ✅ 找到 {len(found)} 个元器件")
+
+                # 显示前几个
+                for comp in found[:3]:
+                    print(f"        • {comp['name']}")
+
+            # 保存识别的文本
+            if save_images and cleaned:
+                txt_name = f"page_{page_num + 1}_img_{img_idx + 1}.txt"
+                with open(os.path.join(output_dir, txt_name),
+                          'w', encoding='utf-8') as f:
+                    f.write(cleaned)
+
+        else:
+            print(f"    图像 {img_idx + 1}: ⚠️ 未识别到文字")
+
+    def _checkpoint_header(self, pdf_path, max_pages):
+        """
+        检查点文件的第一条记录：标识PDF文件和提取参数，任何一项变化都不能复用已有结果
+        """
+        stat = os.stat(pdf_path)
+        header = {
+            'type': 'header',
+            'pdf': os.path.abspath(pdf_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'settings': {
+                'max_pages': max_pages,
+                'ocr_configs': self.ocr_configs,
+                'normalize_images': self.normalize_images,
+                'target_text_height': self.target_text_height,
+                'max_skew_angle': self.max_skew_angle,
+                'small_image_max_side': self.small_image_max_side,
+                'ocr_batch_size': self.ocr_batch_size,
+            }
+        }
+        # 经过一次JSON往返，与从文件读出的记录可以直接比较
+        return json.loads(json.dumps(header, ensure_ascii=False))
+
+    @staticmethod
+    def _read_checkpoint_header(checkpoint_file):
+        try:
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                record = json.loads(f.readline())
+        except (OSError, json.JSONDecodeError):
+            return None
+        return record if isinstance(record, dict) and record.get('type') == 'header' else None
+
+    def _prepare_checkpoint(self, checkpoint_file, header, resume):
+        """
+        准备检查点文件，返回已完成的页码集合
+        - resume 且文件头与当前PDF和参数一致：恢复已完成的页
+        - 文件头不一致（其他PDF、PDF已修改、参数变化）：把旧文件改名为 .old 保留，重新开始
+        - 不恢复：删除旧文件
+        """
+        completed_pages = set()
+        if os.path.exists(checkpoint_file):
+            if resume and self._read_checkpoint_header(checkpoint_file) == header:
+                completed_pages = self.load_checkpoint(checkpoint_file)
+            elif resume:
+                os.replace(checkpoint_file, checkpoint_file + '.old')
+                print(f"⚠️ 检查点与当前PDF或参数不一致，已改名为 {os.path.basename(checkpoint_file)}.old，重新开始")
+            else:
+                os.remove(checkpoint_file)
+
+        if not os.path.exists(checkpoint_file):
+            with open(checkpoint_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(header, ensure_ascii=False) + '\n')
+        return completed_pages
+
+    def load_checkpoint(self, checkpoint_file):
+        """
+        从逐页检查点文件(JSON Lines)恢复结果，返回已完成的页码集合
+        """
+        completed_pages = set()
+        self._reset_results()
+
+        if not checkpoint_file or not os.path.exists(checkpoint_file):
+            return completed_pages
+
+        records = {}
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程被中断时最后一行可能不完整，丢弃即可（该页会重新处理）
+                    continue
+                if 'page' in record:  # 跳过文件头
+                    records[record['page']] = record
+
+        # 按页码顺序重建结果
+        for page in sorted(records):
+            record = records[page]
+            self._add_components(record['components'])
+            for key, value in record['stats'].items():
+                self.stats[key] += value
+            completed_pages.add(page)
+
+        return completed_pages
+
+    def _save_page_checkpoint(self, checkpoint_file, page_num, components, page_stats):
+        """
+        追加写入一页的检查点，写完立即落盘
+        """
+        record = {
+            'page': page_num,
+            'components': components,
+            'stats': dict(page_stats)
+        }
+        with open(checkpoint_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def extract_from_pdf(self, pdf_path, max_pages=None, save_images=False,
+                         checkpoint_file=None, resume=False):
         """
         从PDF提取元器件
+
+        checkpoint_file: 逐页检查点文件(JSON Lines)，第一行记录PDF和提取参数，之后每处理完一页追加一条记录
+        resume: 为True时从检查点恢复，跳过已完成的页（只恢复同一PDF、同一参数的检查点）
         """
         print(f"🔍 开始分析: {os.path.basename(pdf_path)}")
 
@@ -234,9 +603,16 @@ class OptimizedComponentExtractor:
             print(f"❌ 文件不存在: {pdf_path}")
             return []
 
+        completed_pages = set()
+        if checkpoint_file:
+            header = self._checkpoint_header(pdf_path, max_pages)
+            completed_pages = self._prepare_checkpoint(checkpoint_file, header, resume)
+            if completed_pages:
+                print(f"♻️ 从检查点恢复: 已完成 {len(completed_pages)} 页, {len(self.components)} 个元器件")
+
         # 创建输出目录
+        output_dir = "processed_images"
         if save_images:
-            output_dir = "processed_images"
             os.makedirs(output_dir, exist_ok=True)
 
         try:
@@ -249,9 +625,17 @@ class OptimizedComponentExtractor:
             print(f"📊 PDF总页数: {len(doc)} (处理前 {total_pages} 页)")
 
             for page_num in range(total_pages):
+                if page_num + 1 in completed_pages:
+                    print(f"\n📖 第 {page_num + 1}/{total_pages} 页 (已完成，跳过)")
+                    continue
+
                 print(f"\n📖 第 {page_num + 1}/{total_pages} 页")
                 page = doc[page_num]
 
+                # 记录本页开始前的状态，用于写检查点
+                page_start = len(self.components)
+                stats_before = dict(self.stats)
+
                 # 获取页面图像
                 image_list = page.get_images()
 
@@ -259,17 +643,15 @@ class OptimizedComponentExtractor:
                     print(f"  发现 {len(image_list)} 个图像")
                     self.stats['total_images'] += len(image_list)
 
+                    pending = []  # 待批量识别的小图像 (img_idx, image)
+
                     for img_idx, img_info in enumerate(image_list):
                         self.stats['processed_images'] += 1
 
                         try:
-                            # 提取图像
+                            # 提取图像（直接解码为灰度数组）
                             xref = img_info[0]
-                            base_image = doc.extract_image(xref)
-                            image_bytes = base_image["image"]
-
-                            # 转换为PIL图像
-                            original = Image.open(io.BytesIO(image_bytes))
+                            original = self.load_gray_image(doc, xref)
 
                             # 预处理图像
                             processed = self._preprocess_image(original)
@@ -280,47 +662,52 @@ class OptimizedComponentExtractor:
                                 img_name = f"page_{page_num + 1}_img_{img_idx + 1}.png"
                                 enhanced.save(os.path.join(output_dir, img_name))
 
+                            # 小图像留到本页末尾批量识别
+                            if self._is_small_image(enhanced):
+                                pending.append((img_idx, enhanced))
+                                continue
+
                             # OCR识别
                             text = self._ocr_with_retry(enhanced)
+                            self._handle_ocr_text(text, page_num, img_idx, save_images, output_dir)
 
-                            if text and text.strip():
-                                # 清理文本
-                                cleaned = self._clean_ocr_text(text)
-
-                                print(f"    图像 {img_idx + 1}: ✓ 识别成功 ({len(cleaned)} 字符)")
-
-                                # 提取元器件
-                                found = self._analyze_text(cleaned, page_num + 1, img_idx + 1)
-
-                                if found:
-                                    self.components.extend(found)
-                                    print(f"      ✅ 找到 {len(found)} 个元器件")
-
-                                    # 显示前几个
-                                    for comp in found[:3]:
-                                        print(f"        • {comp['name']}")
-
-                                # 保存识别的文本
-                                if save_images and cleaned:
-                                    txt_name = f"page_{page_num + 1}_img_{img_idx + 1}.txt"
-                                    with open(os.path.join(output_dir, txt_name),
-                                              'w', encoding='utf-8') as f:
-                                        f.write(cleaned)
+                        except Exception as e:
+                            print(f"    图像 {img_idx + 1}: ❌ 处理失败 - {str(e)[:50]}")
 
-                            else:
-                                print(f"    图像 {img_idx + 1}: ⚠️ 未识别到文字")
+                    # 批量识别本页的小图像
+                    if pending:
+                        print(f"  批量识别 {len(pending)} 个小图像")
 
+                    for start in range(0, len(pending), self.ocr_batch_size):
+                        chunk = pending[start:start + self.ocr_batch_size]
+                        try:
+                            texts = self._ocr_with_retry_batch([image for _, image in chunk])
                         except Exception as e:
-                            print(f"    图像 {img_idx + 1}: ❌ 处理失败 - {str(e)[:50]}")
+                            print(f"    批量识别失败 - {str(e)[:50]}")
+                            continue
+
+                        for (img_idx, _), text in zip(chunk, texts):
+                            self._handle_ocr_text(text, page_num, img_idx, save_images, output_dir)
 
                 else:
                     print(f"  ⚠️ 本页无图像")
 
+                # 写入本页检查点
+                if checkpoint_file:
+                    page_stats = {key: value - stats_before.get(key, 0)
+                                  for key, value in self.stats.items()}
+                    self._save_page_checkpoint(checkpoint_file, page_num + 1,
+                                               self.components[page_start:], page_stats)
+
             doc.close()
 
         except Exception as e:
             print(f"❌ 处理PDF失败: {e}")
 
+        # 最终结果以检查点为准，保证报告与落盘数据一致
+        if checkpoint_file:
+            self.load_checkpoint(checkpoint_file)
+
         return self.components
 
     def _clean_ocr_text(self, text):
@@ -531,99 +918,94 @@ class OptimizedComponentExtractor:
         else:
             return '低'
 
-    def generate_report(self, output_file="ocr_components_report.txt"):
+    def generate_report(self, output_file="ocr_components_report.txt", print_report=False, return_text=False):
         """
-        生成详细报告
+        生成详细报告，逐行写入文件
+
+        统计信息来自 _add_components 维护的累计数据；
+        print_report为True时同时打印到控制台，return_text为True时返回报告文本
         """
         print(f"\n📊 生成分析报告...")
 
-        report = []
-        report.append("=" * 80)
-        report.append("📄 PDF图像元器件识别报告 (使用OCR)")
-        report.append("=" * 80)
-
-        # 统计信息
-        report.append(f"\n📈 处理统计:")
-        report.append(f"  处理的图像总数: {self.stats.get('processed_images', 0)}")
-        report.append(f"  找到的元器件总数: {len(self.components)}")
+        def conf_icon(conf):
+            return '✅' if conf == '高' else '⚠️' if conf == '中' else '❓'
 
-        if self.components:
-            # 按类别统计
-            category_stats = defaultdict(int)
-            type_stats = defaultdict(int)
-            confidence_stats = defaultdict(int)
-
-            for comp in self.components:
-                category_stats[comp['category']] += 1
-                type_stats[comp['type']] += 1
-                confidence_stats[comp['confidence']] += 1
+        try:
+            f = open(output_file, 'w', encoding='utf-8')
+        except Exception as e:
+            print(f"❌ 保存报告失败: {e}")
+            return None
 
-            report.append(f"\n🔧 元器件分类:")
-            for category, count in sorted(category_stats.items(), key=lambda x: x[1], reverse=True):
-                report.append(f"  {category}: {count}个")
+        report = [] if return_text else None
 
-            report.append(f"\n📋 识别类型:")
-            for type_name, count in sorted(type_stats.items(), key=lambda x: x[1], reverse=True):
-                report.append(f"  {type_name}: {count}个")
+        def emit(line):
+            f.write(line + "\n")
+            if print_report:
+                print(line)
+            if report is not None:
+                report.append(line)
 
-            report.append(f"\n🎯 置信度分布:")
-            for conf, count in sorted(confidence_stats.items()):
-                icon = '✅' if conf == '高' else '⚠️' if conf == '中' else '❓'
-                report.append(f"  {icon} {conf}: {count}个")
+        with f:
+            emit("=" * 80)
+            emit("📄 PDF图像元器件识别报告 (使用OCR)")
+            emit("=" * 80)
 
-            # 详细列表（按页码）
-            report.append(f"\n📖 详细元器件列表:")
+            # 统计信息
+            emit(f"\n📈 处理统计:")
+            emit(f"  处理的图像总数: {self.stats.get('processed_images', 0)}")
+            emit(f"  找到的元器件总数: {len(self.components)}")
 
-            by_page = defaultdict(list)
-            for comp in self.components:
-                by_page[comp['page']].append(comp)
+            if self.components:
+                emit(f"\n🔧 元器件分类:")
+                for category, count in sorted(self.category_stats.items(), key=lambda x: x[1], reverse=True):
+                    emit(f"  {category}: {count}个")
 
-            for page in sorted(by_page.keys()):
-                report.append(f"\n  第 {page} 页 ({len(by_page[page])}个):")
+                emit(f"\n📋 识别类型:")
+                for type_name, count in sorted(self.type_stats.items(), key=lambda x: x[1], reverse=True):
+                    emit(f"  {type_name}: {count}个")
 
-                for i, comp in enumerate(by_page[page][:15], 1):
-                    conf_icon = '✅' if comp['confidence'] == '高' else '⚠️' if comp['confidence'] == '中' else '❓'
+                emit(f"\n🎯 置信度分布:")
+                for conf, count in sorted(self.confidence_stats.items()):
+                    emit(f"  {conf_icon(conf)} {conf}: {count}个")
 
-                    line = f"    {i:2d}. {conf_icon} {comp['name']}"
+                # 详细列表（按页码）
+                emit(f"\n📖 详细元器件列表:")
 
-                    if comp.get('code'):
-                        line += f" [编码: {comp['code']}]"
+                for page in sorted(self.page_counts.keys()):
+                    page_count = self.page_counts[page]
+                    emit(f"\n  第 {page} 页 ({page_count}个):")
 
-                    if comp.get('specifications'):
-                        specs = comp['specifications']
-                        if 'dimensions' in specs:
-                            dims = specs['dimensions']
-                            if isinstance(dims, tuple):
-                                line += f" (尺寸: {'×'.join(map(str, dims))})"
-                            else:
-                                line += f" (尺寸: {dims})"
+                    for i, comp in enumerate(self.page_preview[page], 1):
+                        line = f"    {i:2d}. {conf_icon(comp['confidence'])} {comp['name']}"
 
-                    report.append(line)
+                        if comp.get('code'):
+                            line += f" [编码: {comp['code']}]"
 
-                if len(by_page[page]) > 15:
-                    report.append(f"    ... 还有 {len(by_page[page]) - 15} 个")
+                        if comp.get('specifications'):
+                            specs = comp['specifications']
+                            if 'dimensions' in specs:
+                                dims = specs['dimensions']
+                                if isinstance(dims, (tuple, list)):
+                                    line += f" (尺寸: {'×'.join(map(str, dims))})"
+                                else:
+                                    line += f" (尺寸: {dims})"
 
-        else:
-            report.append(f"\n⚠️ 未找到任何元器件")
+                        emit(line)
 
-        report.append(f"\n{'=' * 80}")
-        report.append("报告生成完成")
-        report.append("=" * 80)
+                    if page_count > self.report_page_limit:
+                        emit(f"    ... 还有 {page_count - self.report_page_limit} 个")
 
-        report_text = "\n".join(report)
+            else:
+                emit(f"\n⚠️ 未找到任何元器件")
 
-        # 保存报告
-        try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(report_text)
-            print(f"✅ 报告已保存到: {output_file}")
-        except Exception as e:
-            print(f"❌ 保存报告失败: {e}")
+            emit(f"\n{'=' * 80}")
+            emit("报告生成完成")
+            emit("=" * 80)
 
-        # 打印到控制台
-        print(report_text)
+        print(f"✅ 报告已保存到: {output_file}")
 
-        return report_text
+        if report is not None:
+            return "\n".join(report)
 
     def export_data(self, output_file="ocr_components_data.json"):
         """
@@ -719,7 +1101,10 @@ def main():
     components = extractor.extract_from_pdf(
         pdf_path=pdf_path,
         max_pages=None,  # None表示处理所有页，可以设为5进行测试
-        save_images=True  # 保存处理后的图像用于调试
+        save_images=True,  # 保存处理后的图像用于调试
+        # 逐页检查点，按PDF命名；文件头记录PDF和参数，不一致时不会复用
+        checkpoint_file=f"{os.path.splitext(os.path.basename(pdf_path))[0]}_OCR进度.jsonl",
+        resume=True  # 中断后重新运行时跳过已完成的页
     )
 
     # 生成报告